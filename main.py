@@ -1,8 +1,12 @@
 import os
+import logging
+import logging.handlers
+import queue
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
 import asyncio
-from src.painhunter.rss_fetcher import fetch_reddit_posts
+from src.painhunter.rss_fetcher import fetch_reddit_posts_async, mark_posts_seen
 from src.painhunter.analyzer import analyze_pain_points_by_source, print_analysis_report
 from src.painhunter.emailer import send_report, generate_html_report
 
@@ -11,6 +15,22 @@ from src.painhunter.emailer import send_report, generate_html_report
 load_dotenv()
 
 
+def setup_logging() -> logging.handlers.QueueListener:
+    """Route log records through a queue so concurrent coroutines never block on stdout."""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    # Keep third-party HTTP client request logs quiet
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    listener.start()
+    return listener
+
+
 async def main():
     """Main entry point for Painhunter (async version)."""
     print("=== Painhunter: Reddit Pain Point Hunter ===\n")
@@ -22,7 +42,7 @@ async def main():
         return
 
     # Fetch and filter posts
-    posts = fetch_reddit_posts(
+    posts = await fetch_reddit_posts_async(
         subreddits=["SaaS", "Entrepreneur", "SideProject", "smallbusiness"],
         hours_ago=24,
     )
@@ -46,6 +66,11 @@ async def main():
             f.write(html_report)
         print(f"\nHTML report saved to: {report_filename}")
 
+        # Only record posts once they made it into a report; failed ones are retried next run
+        if os.environ.get("PAINHUNTER_SKIP_SEEN"):
+            failed_links = set(analysis.get("failed_links", ()))
+            mark_posts_seen([post for post in posts if post["link"] not in failed_links])
+
         # Try to send email report
         print("\nAttempting to send email report...")
         if send_report(analysis):
@@ -55,4 +80,8 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    listener = setup_logging()
+    try:
+        asyncio.run(main())
+    finally:
+        listener.stop()
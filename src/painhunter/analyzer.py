@@ -1,10 +1,45 @@
 """AI Analyzer module for Reddit pain point analysis using OpenAI-compatible API."""
 
 import asyncio
+import importlib.util
+import json
+import logging
+import math
 import os
+import random
+import re
 import time
-from typing import List, Dict
-from openai import AsyncOpenAI
+from collections import defaultdict
+from functools import lru_cache
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import httpx
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    BadRequestError,
+    DefaultAsyncHttpxClient,
+    InternalServerError,
+    RateLimitError,
+)
+
+from src.painhunter import prompts_en, prompts_zh
+from src.painhunter.cache import get_analysis_cache, get_llm_cache, make_cache_key
+
+
+logger = logging.getLogger(__name__)
+
+# 安装了可选的 h2 包（httpx[http2]）时，LLM 请求与 RSS 抓取一样通过 HTTP/2 多路复用单个连接
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _prompts():
+    """根据 PAINHUNTER_LANG 选择提示词模块（默认中文，en 开头选择英文）。
+
+    在调用时而非导入时读取，main.py 在导入本模块之后才加载 .env。
+    """
+    lang = (os.environ.get("PAINHUNTER_LANG") or "zh").strip().lower()
+    return prompts_en if lang.startswith("en") else prompts_zh
 
 
 class RateLimiter:
@@ -46,136 +81,51 @@ class RateLimiter:
 rate_limiter = RateLimiter(max_rpm=4)
 
 
-# System prompt for pain point analysis
-SYSTEM_PROMPT = """你是一位浏览器插件产品分析师和独立开发者顾问。你的使命是发现独立开发者可以快速构建并变现的产品机会。
-
-## 核心优先级
-
-**产品形态优先级（按顺序）：**
-1. **浏览器插件** - 优先识别，任何涉及浏览器操作、网页增强、用户脚本的需求
-2. **轻量级 Web 应用** - 配合浏览器插件使用的辅助服务
-3. **其他产品** - 仅在上述都不适用时考虑
-
-## 分析维度
-
-对于每批帖子，你需要分析并提取：
-
-### 1. 痛点总结
-用户抱怨或寻求解决方案的具体问题是什么？用一句话精准描述。
-
-### 2. 目标受众
-谁面临这个问题？（具体到职业/场景，如：独立站卖家、程序员、内容创作者）
-
-### 3. 产品形态判定
-- "browser_extension" - 浏览器插件需求
-- "web_app" - 独立 Web 应用
-- "saas" - SaaS 服务
-- "other" - 其他
-
-### 4. 评分维度 (1-5分)
-
-#### 技术实现难度 (tech_complexity_score)
-- 1分: 单文件插件，Claude Code 可在数小时内完成
-- 2分: 简单插件 + 本地存储，无需后端
-- 3分: 插件 + 简单后端 API (FastAPI/Cloudflare Workers)
-- 4分: 复杂插件 + 完整后端 + 认证系统
-- 5分: 需要复杂基础设施或第三方集成
-
-#### 变现潜力 (monetization_score)
-- 1分: 小众需求，难以规模化
-- 2分: 细分市场，潜在用户有限
-- 3分: 中等市场，可支撑 $5-15/月定价
-- 4分: 较大市场，可支撑 $15-29/月定价
-- 5分: 广阔市场，有涨价空间
-
-#### Claude Code 实现可行性 (claude_code_score)
-- 1分: Claude Code 可独立完成，无需人工介入
-- 3分: 需要少量人工指导和代码审查
-- 5分: 需要大量人工干预和复杂架构设计
-
-### 5. MVP 建议格式
-必须使用 "【X】插件 + Y 功能" 格式，例如：
-- "【标签页管理】Tab 增强插件 + AI 自动分类功能"
-- "【评论增强】插件 + 一键模板回复功能"
-
-每个机会给出 1-2 个 MVP 建议。
-
-### 6. 预估定价
-给出合理的订阅价格区间（$5-29/月）。
-
-请用中文返回分析结果，使用指定的 JSON 格式。"""
-
-
-USER_PROMPT_TEMPLATE = """分析这 {count} 条 Reddit 帖子，基于用户痛点识别浏览器插件类商业机会。
-
-## 待分析的帖子：
-{posts_text}
-
-## 输出格式 (JSON)：
-{{
-  "opportunities": [
-    {{
-      "pain_point": "用户面临问题的精准描述",
-      "target_audience": "具体目标用户群体",
-      "product_type": "browser_extension | web_app | saas | other",
-      "tech_complexity_score": 1-5,
-      "monetization_score": 1-5,
-      "claude_code_score": 1-5,
-      "pricing_estimate": "$X-$Y/月",
-      "mvp_suggestions": [
-        "【类型】插件 + 核心功能描述"
-      ],
-      "tech_stack_recommendation": "推荐技术栈",
-      "differentiation": "与竞品的差异化点",
-      "revenue_potential": "预估月收入（如：1000用户×$10 = $10,000/月）",
-      "source_posts": ["帖子标题 1", "帖子标题 2"]
-    }}
-  ],
-  "summary": {{
-    "total_opportunities": 5,
-    "browser_extension_count": 3,
-    "quick_win": "技术复杂度1分，可立即实现的机会"
-  }}
-}}
-
-## 评分标准
-
-### 技术实现难度 (tech_complexity_score)
-- 1: 单文件油猴脚本/简单书签工具
-- 2: 简单 Chrome 扩展，manifest V3，基础功能
-- 3: 中等复杂度插件，Popup + Content Script + Background，无复杂后端
-- 4: 复杂插件，需要后端 API
-- 5: 复杂系统，需要数据库、认证、支付
-
-### 变现潜力 (monetization_score)
-- 1-2: 小众市场
-- 3: 细分市场，可支撑 $5-15/月
-- 4: 中等市场，可支撑 $15-29/月
-- 5: 大众市场，有涨价空间
-
-### Claude Code 可实现性 (claude_code_score)
-- 1: Claude Code 可独立完成全部代码
-- 2-3: Claude Code 可完成大部分，需少量人工
-- 4-5: 需要大量人工设计和编码
-
-## 关键要求
-- 只输出 3-5 个最有价值的机会
-- MVP 必须是 Claude Code 可在 1-3 天内实现的产品
-- 优先选择浏览器插件类机会
-- 预估定价必须落在 $5-29/月 区间"""
+@lru_cache(maxsize=4096)
+def _format_post(subreddit: str, title: str, summary: str, link: str) -> str:
+    """Format a single post; memoized since the same posts are sent in both stages."""
+    return f"r/{subreddit}\nTitle: {title}\nSummary: {summary}\nLink: {link}"
 
 
 def format_posts_for_analysis(posts: List[Dict]) -> str:
     """Format posts into a readable text block for the LLM."""
-    formatted = []
-    for i, post in enumerate(posts, 1):
-        formatted.append(
-            f"[{i}] r/{post['subreddit']}\n"
-            f"Title: {post['title']}\n"
-            f"Summary: {post['summary']}\n"
-            f"Link: {post['link']}"
-        )
-    return "\n\n".join(formatted)
+    return "\n\n".join(
+        f"[{i}] {_format_post(post['subreddit'], post['title'], post['summary'], post['link'])}"
+        for i, post in enumerate(posts, 1)
+    )
+
+
+def _create_client() -> AsyncOpenAI:
+    """根据环境变量创建 AsyncOpenAI 客户端。
+
+    初筛和深度分析共用同一个客户端及其 keep-alive 连接池，避免每次调用重新握手。
+    """
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not set in environment")
+
+    base_url = os.environ.get("OPENAI_BASE_URL") or "https://generativelanguage.googleapis.com/v1beta/openai/"
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+        http2=_HTTP2_AVAILABLE,
+    )
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+
+# 限流、超时、连接中断和服务端错误值得对同一模型重试
+_RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+def _retry_delay(error: Exception, attempt: int, multiplier: float = 0.3, max_delay: float = 8.0) -> float:
+    """计算重试等待时间：优先遵循 Retry-After 响应头，否则使用带随机抖动的指数退避。"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_delay, multiplier * 2 ** attempt))
 
 
 async def _try_call_llm_async(
@@ -183,6 +133,7 @@ async def _try_call_llm_async(
     messages: List[Dict],
     model: str = None,
     max_retries: int = 2,
+    response_format: Dict = None,
 ) -> str:
     """异步尝试调用 LLM，支持模型递进降级。
 
@@ -195,6 +146,7 @@ async def _try_call_llm_async(
         messages: 消息列表
         model: 首选模型（默认从环境变量 OPENAI_MODEL 读取）
         max_retries: 每个模型的最大重试次数
+        response_format: 结构化输出参数（如 {"type": "json_object"}），模型不支持时自动去掉重试
 
     Returns:
         LLM 响应内容
@@ -209,168 +161,423 @@ async def _try_call_llm_async(
 
     last_error = None
     for attempt_model in models:
+        extra_kwargs = {"response_format": response_format} if response_format else {}
         for attempt in range(max_retries):
             try:
-                print(f"  尝试模型: {attempt_model} (第 {attempt + 1} 次)")
+                logger.info(f"  尝试模型: {attempt_model} (第 {attempt + 1} 次)")
                 # 速率限制：请求前等待
                 await rate_limiter.acquire()
-                print(f"  当前 RPM: {rate_limiter.get_current_rpm():.1f}")
-                response = await client.chat.completions.create(
+                logger.info(f"  当前 RPM: {rate_limiter.get_current_rpm():.1f}")
+                # 流式接收响应，边到达边拼接，避免长 JSON 输出期间连接空闲
+                stream = await client.chat.completions.create(
                     model=attempt_model,
                     messages=messages,
+                    stream=True,
+                    **extra_kwargs,
                 )
-                return response.choices[0].message.content
+                parts = []
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                return "".join(parts)
             except Exception as e:
                 last_error = e
-                print(f"  模型 {attempt_model} 调用失败: {e}")
+                logger.warning(f"  模型 {attempt_model} 调用失败: {e}")
+                # 部分模型/网关不支持 response_format，去掉后立即重试
+                if isinstance(e, BadRequestError) and extra_kwargs:
+                    logger.warning(f"  模型 {attempt_model} 可能不支持 response_format，去掉后重试")
+                    extra_kwargs = {}
+                    continue
+                # 参数错误、鉴权失败等不可重试错误，直接降级到下一个模型
+                if not isinstance(e, _RETRYABLE_ERRORS):
+                    break
                 if attempt < max_retries - 1:
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(_retry_delay(e, attempt))
                 continue
         # 尝试下一个模型
-        print(f"  模型 {attempt_model} 多次失败，尝试下一个模型...")
+        logger.warning(f"  模型 {attempt_model} 多次失败，尝试下一个模型...")
 
     raise RuntimeError(f"所有模型调用失败: {last_error}")
 
 
-async def screen_posts_with_llm(posts: List[Dict]) -> List[Dict]:
-    """使用 LLM 语义理解筛选有价值的帖子（异步并发执行）。
+def _parse_screening_flags(content: str, count: int) -> Optional[List[bool]]:
+    """解析 Y/N 字母串初筛结果，长度与批次不一致时返回 None。"""
+    flags = re.sub(r"[\s`|,]", "", content or "").upper()
+    if len(flags) != count or set(flags) - {"Y", "N"}:
+        return None
+    return [flag == "Y" for flag in flags]
 
-    Args:
-        posts: 原始帖子列表
 
-    Returns:
-        筛选后的有价值帖子列表
-    """
-    if not posts:
+# 预编译的 JSON 提取正则：匹配第一个 { / [ 到最后一个 } / ]，自动跳过 ```json 代码块标记和前后说明文字
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_LINE_COMMENT = re.compile(r"^\s*//.*$", re.MULTILINE)
+
+
+def _loads_json_block(content: str, pattern: re.Pattern):
+    """从 LLM 响应中提取并解析 JSON，无法解析时返回 None。"""
+    match = pattern.search(content or "")
+    if not match:
+        return None
+
+    json_str = match.group(0)
+    # 尝试多次解析，增加容错
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        # 如果解析失败，移除整行注释和尾随逗号后重试
+        json_str_clean = _TRAILING_COMMA.sub(r"\1", _LINE_COMMENT.sub("", json_str))
+        try:
+            return json.loads(json_str_clean)
+        except json.JSONDecodeError:
+            return None
+
+
+def _parse_screening_json(content: str, count: int) -> Optional[List[Optional[bool]]]:
+    """解析调试模式下的 JSON 初筛结果，未给出判断的帖子为 None。"""
+    results = _loads_json_block(content, _JSON_ARRAY)
+    if not isinstance(results, list):
+        return None
+
+    verdicts = [None] * count
+    for item in results:
+        if not isinstance(item, dict):
+            continue
+        idx = item.get("index", -1)
+        if isinstance(idx, int) and 0 <= idx < count:
+            verdicts[idx] = bool(item.get("is_valuable"))
+    return verdicts
+
+
+def _split_batches(indices: List[int], max_calls: int = 15) -> List[List[int]]:
+    """将帖子索引切分为不超过 max_calls 个批次，各批次大小最多相差 1。"""
+    total = len(indices)
+    if not total:
         return []
+    batch_size = (total + max_calls - 1) // max_calls
+    num_batches = (total + batch_size - 1) // batch_size
+    base, extra = divmod(total, num_batches)
+
+    batches = []
+    start = 0
+    for i in range(num_batches):
+        end = start + base + (1 if i < extra else 0)
+        batches.append(indices[start:end])
+        start = end
+    return batches
 
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not set in environment")
 
-    base_url = os.environ.get("OPENAI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai/")
-    client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+async def _iter_screened_batches(
+    posts: List[Dict], client: AsyncOpenAI
+) -> AsyncIterator[Tuple[List[int], List[int]]]:
+    """逐批产出初筛结果，每个批次的 LLM 调用一完成就立即产出。
 
-    # 计算批次大小：目标调用次数 ≤ 15
-    import math
+    缓存命中的帖子最先作为一个批次产出；调用或解析失败的批次也会产出（有价值列表为 None），
+    以便调用方确认这些帖子已处理完毕。
 
+    Yields:
+        (本批次帖子索引列表, 其中有价值帖子的索引列表，失败时为 None)
+    """
     total_posts = len(posts)
-    max_calls = 15
-    batch_size = math.ceil(total_posts / max_calls)
     max_concurrent = 4  # 最大并发数
 
-    print(f"\nLLM 初筛：共 {total_posts} 条帖子，分 {math.ceil(total_posts / batch_size)} 批处理，并发数: {max_concurrent}")
+    # 默认只要求逐条输出 Y/N，调试模式下要求返回带理由的 JSON
+    debug = bool(os.environ.get("PAINHUNTER_SCREEN_DEBUG"))
+    prompts = _prompts()
+    screening_prompt = prompts.SCREENING_PROMPT_DEBUG if debug else prompts.SCREENING_PROMPT
+    system_content = (
+        prompts.SCREENING_SYSTEM_PROMPT_DEBUG if debug else prompts.SCREENING_SYSTEM_PROMPT
+    )
 
-    screening_prompt = """判断每条 Reddit 帖子是否包含以下特征（只返回 JSON 数组）：
+    # 按单条帖子缓存初筛结论，跨批次、跨运行复用
+    cache = get_llm_cache()
+    post_keys = [
+        make_cache_key("screen", screening_prompt, post["subreddit"], post["title"], post["summary"])
+        for post in posts
+    ]
 
-判断标准（满足任意一条即为有价值）：
-1. 用户遇到痛点或问题，正在寻求解决方案
-2. 用户表达了对现有工具/产品的不满
-3. 用户有明确的产品想法或功能需求
-4. 适合独立开发者快速构建的浏览器插件或轻量级 Web 应用机会
+    cached_indices = []
+    cached_valuable = []
+    pending_indices = []
+    for i, key in enumerate(post_keys):
+        cached = cache.get(key) if cache else None
+        if cached is None:
+            pending_indices.append(i)
+        else:
+            cached_indices.append(i)
+            if cached == "1":
+                cached_valuable.append(i)
+
+    if cached_indices:
+        logger.info(f"\nLLM 初筛缓存命中 {len(cached_indices)}/{total_posts} 条帖子")
+        yield cached_indices, cached_valuable
 
-输出格式（JSON 数组）：
-[
-  {"index": 0, "is_valuable": true, "reason": "简短理由"},
-  {"index": 1, "is_valuable": false, "reason": "..."}
-]
+    batches = _split_batches(pending_indices)
+    if not batches:
+        return
 
-只返回 JSON，不要其他内容。"""
+    logger.info(f"\nLLM 初筛：共 {len(pending_indices)} 条帖子，分 {len(batches)} 批处理，并发数: {max_concurrent}")
 
     semaphore = asyncio.Semaphore(max_concurrent)
 
-    async def process_batch(batch_start: int) -> List[int]:
-        """处理单个批次，返回有价值帖子的索引列表。"""
+    async def process_batch(batch_no: int, batch_indices: List[int]) -> Tuple[List[int], Optional[List[int]]]:
+        """处理单个批次，返回 (批次索引列表, 有价值帖子的索引列表)，失败时后者为 None。"""
         async with semaphore:
-            batch_end = min(batch_start + batch_size, total_posts)
-            batch_posts = posts[batch_start:batch_end]
-
-            posts_text = format_posts_for_analysis(batch_posts)
-            messages = [
-                {"role": "system", "content": "你是一个帖子筛选助手，只返回 JSON 格式的判断结果。"},
-                {"role": "user", "content": f"{screening_prompt}\n\n待筛选的帖子：\n\n{posts_text}"},
-            ]
-
-            print(f"  处理批次 {batch_start // batch_size + 1}: 帖子 {batch_start + 1}-{batch_end}")
-
             valuable_indices = []
             try:
-                # 初筛使用主模型，失败后降级到 filter model
+                batch_posts = [posts[i] for i in batch_indices]
+                posts_text = format_posts_for_analysis(batch_posts)
+                user_content = prompts.SCREENING_USER_TEMPLATE.format(
+                    prompt=screening_prompt, posts_text=posts_text
+                )
+                messages = [
+                    {"role": "system", "content": system_content},
+                    {"role": "user", "content": user_content},
+                ]
+
+                logger.info(f"  处理批次 {batch_no}: {len(batch_indices)} 条帖子")
+
+                # 初筛使用主模型，失败后降级到 filter model；结果按帖子缓存，不缓存整批响应
                 content = await _try_call_llm_async(client, messages)
 
-                import json
-                import re
-
-                # 清理可能的代码块标记 (```json ... ```)
-                cleaned_content = content
-                # 移除 markdown 代码块标记
-                cleaned_content = re.sub(r'^```json\s*', '', cleaned_content, flags=re.MULTILINE)
-                cleaned_content = re.sub(r'\s*^```\s*$', '', cleaned_content, flags=re.MULTILINE)
-                # 移除行内代码块标记
-                cleaned_content = re.sub(r'`([^`]+)`', r'\1', cleaned_content)
-
-                # 提取 JSON 数组
-                start = cleaned_content.find("[")
-                end = cleaned_content.rfind("]") + 1
-                if start != -1 and end != 0:
-                    json_str = cleaned_content[start:end]
-                    # 尝试多次解析，增加容错
-                    try:
-                        results = json.loads(json_str)
-                    except json.JSONDecodeError as e:
-                        # 如果解析失败，尝试更激进的清理
-                        # 移除可能的注释或尾随逗号
-                        json_str_clean = re.sub(r',\s*([}\]])', r'\1', json_str)
-                        json_str_clean = re.sub(r'//.*$', '', json_str_clean, flags=re.MULTILINE)
-                        try:
-                            results = json.loads(json_str_clean)
-                        except json.JSONDecodeError:
-                            print(f"  警告：批次 {batch_start // batch_size + 1} JSON 解析仍失败")
-                            print(f"  原始内容: {cleaned_content[:200]}...")
-                            return valuable_indices
-
-                    for item in results:
-                        idx = item.get("index", -1)
-                        if idx >= 0 and item.get("is_valuable"):
-                            actual_idx = batch_start + idx
-                            if actual_idx < total_posts:
-                                valuable_indices.append(actual_idx)
+                if debug:
+                    verdicts = _parse_screening_json(content, len(batch_indices))
                 else:
-                    print(f"  警告：批次 {batch_start // batch_size + 1} 解析失败")
+                    verdicts = _parse_screening_flags(content, len(batch_indices))
+                if verdicts is None:
+                    logger.warning(f"  警告：批次 {batch_no} 解析失败")
+                    logger.warning(f"  原始内容: {content[:200]}...")
+                    return batch_indices, None
+
+                new_verdicts = []
+                for actual_idx, is_valuable in zip(batch_indices, verdicts):
+                    if is_valuable is None:
+                        continue
+                    new_verdicts.append((post_keys[actual_idx], "1" if is_valuable else "0"))
+                    if is_valuable:
+                        valuable_indices.append(actual_idx)
+                # 整批结论一次写入，只提交一次
+                if cache:
+                    cache.set_many(new_verdicts)
 
             except Exception as e:
-                print(f"  批次 {batch_start // batch_size + 1} 处理失败: {e}")
+                logger.warning(f"  批次 {batch_no} 处理失败: {e}")
+                return batch_indices, None
+
+            return batch_indices, valuable_indices
+
+    # 并发处理所有批次，按完成顺序产出
+    tasks = [
+        asyncio.ensure_future(process_batch(batch_no, batch))
+        for batch_no, batch in enumerate(batches, 1)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # 调用方提前退出时取消尚未完成的批次
+        for task in tasks:
+            task.cancel()
 
-            return valuable_indices
 
-    # 并发处理所有批次
-    batch_starts = list(range(0, total_posts, batch_size))
+async def screen_posts_with_llm(posts: List[Dict], client: AsyncOpenAI = None) -> List[Dict]:
+    """使用 LLM 语义理解筛选有价值的帖子（异步并发执行）。
+
+    Args:
+        posts: 原始帖子列表
+        client: 共享的 AsyncOpenAI 客户端（为 None 时根据环境变量创建）
+
+    Returns:
+        筛选后的有价值帖子列表
+    """
+    if not posts:
+        return []
 
-    tasks = [process_batch(bs) for bs in batch_starts]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    if client is None:
+        client = _create_client()
 
-    # 收集结果
     all_valuable_indices = []
-    for result in results:
-        if isinstance(result, Exception):
-            print(f"批次处理异常: {result}")
-        else:
-            all_valuable_indices.extend(result)
+    async for _, valuable_indices in _iter_screened_batches(posts, client):
+        all_valuable_indices.extend(valuable_indices or ())
 
-    # 返回筛选后的帖子
-    valuable_posts = [posts[i] for i in all_valuable_indices if i < len(posts)]
-    print(f"\nLLM 初筛完成：保留 {len(valuable_posts)}/{total_posts} 条有价值帖子")
+    # 返回筛选后的帖子（保持原始顺序）
+    valuable_posts = [posts[i] for i in sorted(all_valuable_indices)]
+    logger.info(f"\nLLM 初筛完成：保留 {len(valuable_posts)}/{len(posts)} 条有价值帖子")
 
     return valuable_posts
 
 
+# 产品类型标准化映射，支持中文和英文输入
+PRODUCT_TYPE_MAP = {
+    # 浏览器插件类
+    "browser_extension": "browser_extension",
+    "浏览器插件": "browser_extension",
+    "浏览器插件需求": "browser_extension",
+    "Chrome 扩展": "browser_extension",
+    "Chrome扩展": "browser_extension",
+    "浏览器扩展": "browser_extension",
+    "油猴脚本": "browser_extension",
+    "书签工具": "browser_extension",
+
+    # Web 应用类
+    "web_app": "web_app",
+    "Web应用": "web_app",
+    "独立Web应用": "web_app",
+    "独立 Web 应用": "web_app",
+    "Web App": "web_app",
+    "轻量级 Web 应用": "web_app",
+
+    # SaaS 类
+    "saas": "saas",
+    "SaaS": "saas",
+    "SaaS服务": "saas",
+
+    # 其他
+    "其他": "other",
+    "other": "other",
+}
+
+
+def _normalize_type_key(product_type: str) -> str:
+    """统一大小写、空白和连字符，消除 LLM 输出的格式差异。"""
+    key = "".join(str(product_type).split()).casefold()
+    return key.replace("-", "_").replace("需求", "")
+
+
+_NORMALIZED_TYPE_MAP = {_normalize_type_key(k): v for k, v in PRODUCT_TYPE_MAP.items()}
+
+# 精确匹配失败时按关键词归类
+_TYPE_KEYWORDS = (
+    ("browser_extension", ("extension", "插件", "扩展", "脚本", "userscript")),
+    ("saas", ("saas",)),
+    ("web_app", ("web",)),
+)
+# 每个类型的关键词预编译为一个正则，单次扫描即可判断
+_TYPE_PATTERNS = tuple(
+    (type_name, re.compile("|".join(map(re.escape, keywords))))
+    for type_name, keywords in _TYPE_KEYWORDS
+)
+
+
+def normalize_product_type(product_type: str) -> str:
+    """将 LLM 返回的产品类型标准化为 browser_extension / web_app / saas / other。"""
+    if not product_type:
+        return "other"
+    key = _normalize_type_key(product_type)
+    normalized = _NORMALIZED_TYPE_MAP.get(key)
+    if normalized:
+        return normalized
+    for type_name, pattern in _TYPE_PATTERNS:
+        if pattern.search(key):
+            return type_name
+    return "other"
+
+
+_WORD = re.compile(r"\w+")
+
+
+def _post_tokens(post: Dict) -> frozenset:
+    """提取标题和摘要的词集合，用于近似重复判断。"""
+    # 分别扫描标题和摘要，避免为每条帖子拼接新字符串
+    tokens = set(_WORD.findall(post["title"].casefold()))
+    tokens.update(_WORD.findall(post["summary"].casefold()))
+    return frozenset(tokens)
+
+
+def _is_near_duplicate(tokens: frozenset, other: frozenset, threshold: float) -> bool:
+    """判断两个词集合的 Jaccard 相似度是否达到阈值。"""
+    # 长度差距过大时 Jaccard 不可能达到阈值，跳过计算
+    small, large = sorted((len(tokens), len(other)))
+    if small < threshold * large:
+        return False
+    return len(tokens & other) >= threshold * len(tokens | other)
+
+
+def dedupe_posts(posts: List[Dict], threshold: float = 0.85) -> List[Dict]:
+    """合并内容近似（标题和摘要的词集合 Jaccard 相似度 ≥ threshold）的帖子。
+
+    标题相同的帖子优先比较，但同样需要满足相似度阈值，避免 "Feedback Friday"
+    这类各版块固定标题的帖子被误合并。每组重复帖子只保留第一条，其余帖子的
+    subreddit 和链接记录在保留帖子的 crossposts 字段中，分析完成后由
+    _attach_crossposts 回填到商业机会上。
+
+    Args:
+        posts: 原始帖子列表
+        threshold: 判定为近似重复的 Jaccard 相似度阈值
+
+    Returns:
+        去重后的帖子列表（保持原始顺序）
+    """
+    canonical = []  # (post, tokens)
+    by_title = {}
+    for post in posts:
+        title_key = " ".join(post["title"].casefold().split())
+        tokens = _post_tokens(post)
+        match = by_title.get(title_key)
+        if match is not None and not _is_near_duplicate(tokens, canonical[match][1], threshold):
+            match = None
+        if match is None and tokens:
+            match = next(
+                (
+                    index
+                    for index, (_, kept_tokens) in enumerate(canonical)
+                    if _is_near_duplicate(tokens, kept_tokens, threshold)
+                ),
+                None,
+            )
+
+        if match is None:
+            by_title.setdefault(title_key, len(canonical))
+            canonical.append((post, tokens))
+        else:
+            kept = canonical[match][0]
+            if "crossposts" not in kept:
+                kept = dict(kept, crossposts=[])
+                canonical[match] = (kept, canonical[match][1])
+            kept["crossposts"].append({"subreddit": post["subreddit"], "link": post["link"]})
+
+    return [post for post, _ in canonical]
+
+
+def _post_links(post: Dict) -> List[str]:
+    """返回帖子自身及其被合并帖子的链接。"""
+    return [post["link"], *(crosspost["link"] for crosspost in post.get("crossposts", ()))]
+
+
+def _attach_crossposts(opp: Dict, posts: List[Dict]):
+    """将被合并帖子的链接和 subreddit 回填到商业机会的来源信息中。"""
+    crossposts_by_link = {post["link"]: post["crossposts"] for post in posts if post.get("crossposts")}
+    if not crossposts_by_link:
+        return
+    subreddits = []
+    for item in opp.get("source_posts_with_links") or []:
+        crossposts = crossposts_by_link.get(item.get("link"))
+        if crossposts:
+            item["crossposts"] = crossposts
+            subreddits.extend(cp["subreddit"] for cp in crossposts)
+    # 去重并排除机会本身所属的 subreddit，保持出现顺序
+    source = opp.get("source_subreddit")
+    crosspost_subreddits = [sub for sub in dict.fromkeys(subreddits) if sub != source]
+    if crosspost_subreddits:
+        opp["crosspost_subreddits"] = crosspost_subreddits
+
+
+def _clamp_score(score, default: float = 3.0) -> float:
+    """将 LLM 返回的分数限制在 1-5 范围内（保留小数），无法解析或非有限值时使用默认值。"""
+    try:
+        score = float(score)
+    except (TypeError, ValueError, OverflowError):
+        return default
+    if not math.isfinite(score):
+        return default
+    return max(1.0, min(5.0, score))
+
+
 def calculate_overall_score(tech: int, monetize: int, claude: int) -> float:
     """计算综合评分，技术难度权重较低，变现潜力权重较高"""
     # 边界检查，确保分数在 1-5 范围内
-    tech = max(1, min(5, tech))
-    monetize = max(1, min(5, monetize))
-    claude = max(1, min(5, claude))
-    return round((tech * 0.2 + monetize * 0.4 + claude * 0.4), 1)
+    return round(_clamp_score(tech) * 0.2 + _clamp_score(monetize) * 0.4 + _clamp_score(claude) * 0.4, 1)
 
 
 async def analyze_pain_points_by_source(posts: List[Dict]) -> Dict:
@@ -387,29 +594,26 @@ async def analyze_pain_points_by_source(posts: List[Dict]) -> Dict:
     Returns:
         Analysis results with source_subreddit field added to each opportunity
     """
-    from collections import defaultdict
-
     if not posts:
         return {"opportunities": [], "message": "没有可分析的帖子"}
 
-    # 1. LLM 初筛 - 保留有价值帖子（异步并发）
-    print(f"\n{'='*60}")
-    print("阶段 1: LLM 初筛 - 语义理解筛选")
-    print(f"{'='*60}")
-    valuable_posts = await screen_posts_with_llm(posts)
+    # 两个阶段共用一个客户端，结束时统一关闭连接池
+    async with _create_client() as client:
+        return await _analyze_with_client(client, posts)
 
-    if not valuable_posts:
-        return {"opportunities": [], "message": "初筛后没有有价值帖子"}
 
-    # 第二轮深度分析 - 使用 .env 配置的模型
-    print(f"\n{'='*60}")
-    print("阶段 2: 深度分析 - 使用配置模型（并发）")
-    print(f"{'='*60}")
-    posts_by_subreddit = defaultdict(list)
-    for post in valuable_posts:
-        posts_by_subreddit[post['subreddit']].append(post)
+async def _analyze_with_client(client: AsyncOpenAI, posts: List[Dict]) -> Dict:
+    """使用共享客户端执行初筛和深度分析两个阶段。"""
+    # 0. 去除跨 subreddit 的重复帖子和近似重复帖子
+    unique_posts = dedupe_posts(posts)
+    if len(unique_posts) < len(posts):
+        logger.info(f"\n去重：{len(posts)} 条帖子合并为 {len(unique_posts)} 条")
 
-    all_opportunities = []
+    # 1+2. 初筛与深度分析流水线：某个 subreddit 的帖子全部初筛完毕后立即开始深度分析，
+    # 不必等待其他 subreddit 的初筛批次
+    logger.info(f"\n{'='*60}")
+    logger.info("阶段 1: LLM 初筛 - 语义理解筛选（完成的 subreddit 立即进入阶段 2 深度分析）")
+    logger.info(f"{'='*60}")
 
     # 控制深度分析的并发数
     max_concurrent = 4
@@ -418,42 +622,94 @@ async def analyze_pain_points_by_source(posts: List[Dict]) -> Dict:
     async def analyze_subreddit(subreddit: str, group_posts: List[Dict]) -> List[Dict]:
         """并发分析单个 subreddit"""
         async with analysis_semaphore:
-            print(f"\n正在分析 r/{subreddit} 的 {len(group_posts)} 条帖子...")
-            result = await analyze_pain_points(group_posts)
+            logger.info(f"\n正在分析 r/{subreddit} 的 {len(group_posts)} 条帖子...")
+            result = await analyze_pain_points(group_posts, client=client)
+            if "error" in result or "raw_response" in result:
+                raise RuntimeError(f"r/{subreddit} 的分析结果无效")
             opportunities = result.get("opportunities", [])
             for opp in opportunities:
                 opp["source_subreddit"] = subreddit
+                _attach_crossposts(opp, group_posts)
             return opportunities
 
-    # 并发分析所有 subreddit
-    tasks = [analyze_subreddit(sr, posts) for sr, posts in posts_by_subreddit.items()]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # 每个 subreddit 尚未完成初筛的帖子数
+    unscreened = defaultdict(int)
+    for post in unique_posts:
+        unscreened[post['subreddit']] += 1
+
+    valuable_indices_by_subreddit = defaultdict(list)
+    analysis_tasks = {}
+    # 初筛或深度分析失败的帖子链接（含被合并帖子），调用方据此避免将其记为已处理
+    failed_links = set()
+    async for batch_indices, valuable_indices in _iter_screened_batches(unique_posts, client):
+        if valuable_indices is None:
+            for i in batch_indices:
+                failed_links.update(_post_links(unique_posts[i]))
+            valuable_indices = []
+        for i in valuable_indices:
+            valuable_indices_by_subreddit[unique_posts[i]['subreddit']].append(i)
+        for i in batch_indices:
+            unscreened[unique_posts[i]['subreddit']] -= 1
+        for subreddit in {unique_posts[i]['subreddit'] for i in batch_indices}:
+            if unscreened[subreddit] == 0 and valuable_indices_by_subreddit[subreddit]:
+                group_posts = [unique_posts[i] for i in sorted(valuable_indices_by_subreddit[subreddit])]
+                analysis_tasks[subreddit] = asyncio.create_task(analyze_subreddit(subreddit, group_posts))
+
+    # 按帖子原始顺序排列 subreddit，保持输出顺序稳定
+    posts_by_subreddit = {
+        subreddit: valuable_indices_by_subreddit[subreddit]
+        for subreddit in unscreened
+        if valuable_indices_by_subreddit[subreddit]
+    }
+    valuable_count = sum(len(v) for v in posts_by_subreddit.values())
+    logger.info(f"\nLLM 初筛完成：保留 {valuable_count}/{len(unique_posts)} 条有价值帖子")
+
+    if not posts_by_subreddit:
+        return {"opportunities": [], "message": "初筛后没有有价值帖子", "failed_links": sorted(failed_links)}
+
+    # 等待所有深度分析完成
+    all_opportunities = []
+    results = await asyncio.gather(
+        *(analysis_tasks[subreddit] for subreddit in posts_by_subreddit), return_exceptions=True
+    )
 
-    for result in results:
+    for subreddit, result in zip(posts_by_subreddit, results):
         if isinstance(result, Exception):
-            print(f"分析失败: {result}")
+            logger.warning(f"分析失败: {result}")
+            for i in posts_by_subreddit[subreddit]:
+                failed_links.update(_post_links(unique_posts[i]))
         else:
             all_opportunities.extend(result)
 
+    # 被合并的帖子计入各自原始 subreddit 的统计
+    by_subreddit = {k: len(v) for k, v in posts_by_subreddit.items()}
+    for indices in posts_by_subreddit.values():
+        for i in indices:
+            for crosspost in unique_posts[i].get("crossposts", ()):
+                by_subreddit[crosspost["subreddit"]] = by_subreddit.get(crosspost["subreddit"], 0) + 1
+
     # 4. 合并结果
     return {
         "opportunities": all_opportunities,
         "summary": {
             "total_opportunities": len(all_opportunities),
-            "by_subreddit": {k: len(v) for k, v in posts_by_subreddit.items()},
+            "by_subreddit": by_subreddit,
             "posts_screened": len(posts),
-            "posts_after_screening": len(valuable_posts)
-        }
+            "posts_after_dedup": len(unique_posts),
+            "posts_after_screening": valuable_count
+        },
+        "failed_links": sorted(failed_links),
     }
 
 
-async def analyze_pain_points(posts: List[Dict]) -> Dict:
+async def analyze_pain_points(posts: List[Dict], client: AsyncOpenAI = None) -> Dict:
     """Analyze Reddit posts for pain points using OpenAI-compatible API.
 
     Uses OPENAI_API_KEY and OPENAI_BASE_URL from environment or .env file.
 
     Args:
         posts: List of post dictionaries from rss_fetcher
+        client: Shared AsyncOpenAI client (created from environment if None)
 
     Returns:
         Analysis results dictionary
@@ -461,106 +717,96 @@ async def analyze_pain_points(posts: List[Dict]) -> Dict:
     if not posts:
         return {"opportunities": [], "message": "没有可分析的帖子"}
 
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not set in environment")
+    # 相同帖子集合（按链接）的分析结果直接复用，连续两天的 24 小时窗口大量重叠
+    prompts = _prompts()
+    cache = get_analysis_cache()
+    cache_key = make_cache_key(
+        "analysis", prompts.SYSTEM_PROMPT, prompts.USER_PROMPT_TEMPLATE, sorted(post['link'] for post in posts)
+    )
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"\n命中分析结果缓存，跳过 {len(posts)} 条帖子的深度分析")
+            return json.loads(cached)
 
-    base_url = os.environ.get("OPENAI_BASE_URL") or "https://generativelanguage.googleapis.com/v1beta/openai/"
-    model = os.environ.get("OPENAI_MODEL") or "gemini-3-flash-preview"
+    if client is None:
+        client = _create_client()
 
-    client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+    model = os.environ.get("OPENAI_MODEL") or "gemini-3-flash-preview"
 
     posts_text = format_posts_for_analysis(posts)
-    user_prompt = USER_PROMPT_TEMPLATE.format(
+    user_prompt = prompts.USER_PROMPT_TEMPLATE.format(
         count=len(posts),
         posts_text=posts_text,
     )
 
-    print(f"\n正在将 {len(posts)} 条帖子发送给 LLM 进行分析...")
+    logger.info(f"\n正在将 {len(posts)} 条帖子发送给 LLM 进行分析...")
 
     # 使用统一的降级策略调用 LLM
     messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": prompts.SYSTEM_PROMPT},
         {"role": "user", "content": user_prompt},
     ]
-    content = await _try_call_llm_async(client, messages, model=model)
+    # 要求模型直接输出 JSON 对象，减少解析失败
+    content = await _try_call_llm_async(
+        client, messages, model=model, response_format={"type": "json_object"}
+    ) or ""
+    if not content.strip():
+        # 内容过滤等情况下模型可能不返回任何内容
+        logger.warning("LLM 返回空响应")
+        return {"opportunities": [], "error": "empty_response"}
 
     # Parse the JSON response
-    import json
-    try:
-        # Find JSON block
-        start = content.find("{")
-        end = content.rfind("}") + 1
-        if start != -1 and end != 0:
-            json_str = content[start:end]
-            result = json.loads(json_str)
-        else:
-            result = {"raw_response": content, "opportunities": []}
-    except (json.JSONDecodeError, AttributeError) as e:
-        print(f"解析 LLM 响应时出错: {e}")
-        result = {"raw_response": content if 'content' in dir() else "", "opportunities": []}
+    result = _loads_json_block(content, _JSON_OBJECT)
+    if not isinstance(result, dict):
+        logger.warning("解析 LLM 响应时出错: 未找到有效的 JSON 对象")
+        result = {"raw_response": content, "opportunities": []}
 
     # Add source post links by matching titles
     # Create a title-to-link mapping from original posts
     title_to_link = {post['title']: post['link'] for post in posts}
-    
-    # Add links to each opportunity's source posts
+    # Lowercase titles once instead of on every fuzzy comparison
+    lower_title_to_link = {title.lower(): link for title, link in title_to_link.items()}
+
+    # Single pass over opportunities: source links, overall score, product type
+    get_link = title_to_link.get
+    get_lower_link = lower_title_to_link.get
     for opp in result.get("opportunities", []):
-        source_posts = opp.get("source_posts", [])
+        get = opp.get
+
+        # Add links to each opportunity's source posts
         source_links = []
-        for title in source_posts:
-            # Try exact match first
-            link = title_to_link.get(title)
-            if link:
-                source_links.append({"title": title, "link": link})
-            else:
-                # Try fuzzy match (case-insensitive, partial match)
-                for post_title, post_link in title_to_link.items():
-                    if title.lower() in post_title.lower() or post_title.lower() in title.lower():
-                        source_links.append({"title": title, "link": post_link})
-                        break
-                else:
-                    # If no match found, still add title but without link
-                    source_links.append({"title": title, "link": None})
+        for title in get("source_posts") or []:
+            # Try exact match first, then case-insensitive exact match
+            lower_title = title.lower()
+            link = get_link(title) or get_lower_link(lower_title)
+            if not link:
+                # Try fuzzy match (partial match on the pre-lowercased titles)
+                link = next(
+                    (
+                        post_link
+                        for post_title, post_link in lower_title_to_link.items()
+                        if lower_title in post_title or post_title in lower_title
+                    ),
+                    None,
+                )
+            # If no match found, still add title but without link
+            source_links.append({"title": title, "link": link})
         opp["source_posts_with_links"] = source_links
 
-    # 计算综合评分
-    for opp in result.get("opportunities", []):
-        tech = opp.get("tech_complexity_score", 3)
-        monetize = opp.get("monetization_score", 3)
-        claude = opp.get("claude_code_score", 3)
-        opp["overall_score"] = calculate_overall_score(tech, monetize, claude)
+        # 计算综合评分
+        opp["overall_score"] = calculate_overall_score(
+            get("tech_complexity_score", 3),
+            get("monetization_score", 3),
+            get("claude_code_score", 3),
+        )
 
         # 标准化产品类型为英文，支持中文和英文输入
-        product_type = opp.get("product_type", "other")
-        type_map = {
-            # 浏览器插件类
-            "浏览器插件": "browser_extension",
-            "浏览器插件需求": "browser_extension",
-            "Chrome 扩展": "browser_extension",
-            "Chrome扩展": "browser_extension",
-            "浏览器扩展": "browser_extension",
-            "油猴脚本": "browser_extension",
-            "书签工具": "browser_extension",
-
-            # Web 应用类
-            "web_app": "web_app",  # 移除错误映射到 browser_extension
-            "Web应用": "web_app",
-            "独立Web应用": "web_app",
-            "独立 Web 应用": "web_app",
-            "Web App": "web_app",
-            "轻量级 Web 应用": "web_app",
-
-            # SaaS 类
-            "saas": "saas",
-            "SaaS": "saas",
-            "SaaS服务": "saas",
-
-            # 其他
-            "其他": "other",
-            "other": "other",
-        }
-        opp["product_type"] = type_map.get(product_type, "other")
+        opp["product_type"] = normalize_product_type(get("product_type", "other"))
+
+    # 只缓存成功解析的结果，解析失败的下次运行重新请求
+    if cache and "raw_response" not in result:
+        cache.set(cache_key, json.dumps(result, ensure_ascii=False))
 
     return result
 
@@ -608,12 +854,14 @@ if __name__ == "__main__":
     # Test the analyzer
     from src.painhunter.rss_fetcher import fetch_reddit_posts
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     print("正在获取帖子...")
     posts = fetch_reddit_posts(subreddits=["SaaS", "Entrepreneur"], hours_ago=24)
 
     if posts:
         print("\n正在使用 LLM 进行分析...")
-        analysis = analyze_pain_points(posts)
+        analysis = asyncio.run(analyze_pain_points(posts))
         print_analysis_report(analysis)
     else:
         print("未找到可分析的帖子。")
@@ -0,0 +1,155 @@
+"""Persistent cache module for LLM results and fetched feeds."""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# 缓存目录，可通过环境变量 PAINHUNTER_CACHE_DIR 覆盖
+CACHE_DIR = os.path.expanduser(os.environ.get("PAINHUNTER_CACHE_DIR") or "~/.cache/painhunter")
+
+
+def make_cache_key(*parts) -> str:
+    """将任意可 JSON 序列化的内容转换为 SHA-256 缓存键。"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """基于 SQLite 的键值缓存（按缓存键精确匹配，超出容量时按 LRU 淘汰）。
+
+    命中时只在内存中记录访问时间，随下一次写入或 flush() 一并落盘；
+    淘汰在打开缓存时执行一次，之后仅当条目数超出容量一定余量时才再次执行。
+    """
+
+    def __init__(self, path: str = None, table: str = "llm", max_entries: int = None):
+        if path is None:
+            path = os.path.join(CACHE_DIR, "llm_cache.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        # 待写回的访问时间 {key: accessed_at}
+        self._touched = {}
+        # 条目数上界估计（覆盖写入也计数），超过容量加余量时触发淘汰
+        self._count = 0
+        self.prune()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存，未命中返回 None；命中时记录访问时间（不立即写库）。"""
+        row = self.conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        return row[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """批量读取缓存，返回命中的 {key: value}；命中的条目同样记录访问时间。"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        # 分段查询，避免超出 SQLite 单条语句的参数个数上限
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                self.conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            )
+        now = time.time()
+        self._touched.update(dict.fromkeys(found, now))
+        return found
+
+    def set(self, key: str, value: str):
+        """写入缓存（已存在则覆盖）。"""
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[str, str]]):
+        """批量写入缓存并只提交一次，同时写回此前命中的访问时间。"""
+        now = time.time()
+        rows = [(key, value, now) for key, value in items]
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, accessed_at) VALUES (?, ?, ?)", rows
+        )
+        self._count += len(rows)
+        self._write_touched()
+        if self.max_entries and self._count > self.max_entries + max(self.max_entries // 10, 1):
+            self._evict()
+        self.conn.commit()
+
+    def flush(self):
+        """将内存中记录的访问时间写回数据库。"""
+        if self._touched:
+            self._write_touched()
+            self.conn.commit()
+
+    def prune(self):
+        """淘汰超出容量的最久未访问条目。"""
+        self._write_touched()
+        self._evict()
+        self.conn.commit()
+
+    def _write_touched(self):
+        if self._touched:
+            self.conn.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        if self.max_entries:
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE key NOT IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC, rowid DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+        self._count = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+_caches = {}
+
+
+def _get_cache(table: str, max_entries: int) -> Optional[LLMCache]:
+    """获取指定表的全局缓存实例，设置 PAINHUNTER_DISABLE_CACHE 时返回 None。"""
+    if os.environ.get("PAINHUNTER_DISABLE_CACHE"):
+        return None
+    if table not in _caches:
+        _caches[table] = LLMCache(table=table, max_entries=max_entries)
+        # 进程退出时写回只读运行中积累的访问时间
+        atexit.register(_caches[table].flush)
+    return _caches[table]
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """获取单条帖子 LLM 初筛结论的缓存。"""
+    return _get_cache("llm", max_entries=5000)
+
+
+def get_analysis_cache() -> Optional[LLMCache]:
+    """获取按帖子集合缓存的深度分析结果（保留最近 500 条）。"""
+    return _get_cache("analysis", max_entries=500)
+
+
+def get_feed_cache() -> Optional[LLMCache]:
+    """获取 RSS 订阅源缓存（ETag / Last-Modified 及响应内容，按 URL 存储）。"""
+    return _get_cache("feeds", max_entries=200)
+
+
+def get_seen_cache() -> Optional[LLMCache]:
+    """获取已完成分析并生成报告的帖子链接记录（保留最近 20000 条）。"""
+    return _get_cache("seen", max_entries=20000)
+
+
+def get_posts_cache() -> Optional[LLMCache]:
+    """获取按小时分桶的已解析帖子列表缓存（保留最近 200 条）。"""
+    return _get_cache("posts", max_entries=200)
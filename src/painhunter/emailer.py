@@ -1,11 +1,14 @@
 """Email sender module for Painhunter reports."""
 
-import html
+import io
 import os
+import re
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Tuple
+from collections import Counter
+from dataclasses import dataclass
+from email.message import EmailMessage
+from functools import cache, lru_cache
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
 
@@ -317,11 +320,62 @@ HTML_TEMPLATE = """
 """
 
 
+def _minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a CSS block."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return re.sub(r":\s+", ":", css).strip()
+
+
+# Minify the static stylesheet once at import so every report carries fewer bytes
+HTML_TEMPLATE = re.sub(
+    r"(<style>)(.*?)(</style>)",
+    lambda m: m.group(1) + _minify_css(m.group(2)) + m.group(3),
+    HTML_TEMPLATE,
+    count=1,
+    flags=re.S,
+)
+
+
+def _split_template(template: str) -> Tuple[str, str, str]:
+    """Split HTML_TEMPLATE around its placeholders.
+
+    Returns:
+        Tuple of (static prefix, format string for the header fields, static suffix);
+        {content} sits between the last two and is inserted without formatting.
+    """
+    head, _, tail = template.partition("{content}")
+    first_field = re.search(r"(?<!\{)\{\w+\}(?!\})", head)
+    # format() with no arguments only unescapes the doubled CSS braces
+    return head[:first_field.start()].format(), head[first_field.start():], tail.format()
+
+
+# Only the small header section is run through str.format per report
+_REPORT_PREFIX, _REPORT_HEADER_TEMPLATE, _REPORT_SUFFIX = _split_template(HTML_TEMPLATE)
+
+
+# Same replacements as html.escape(quote=True), applied in a single translate() scan
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
+
+@lru_cache(maxsize=2048)
+def _escape_str(text: str) -> str:
+    return text.translate(_HTML_ESCAPE_TABLE)
+
+
 def _escape_html(text: str) -> str:
     """Escape HTML special characters to prevent XSS."""
     if text is None:
         return ""
-    return html.escape(str(text), quote=True)
+    # Coerce before the cached call so unhashable values never reach lru_cache
+    return _escape_str(str(text))
 
 
 OPPORTUNITY_TEMPLATE = """
@@ -360,6 +414,37 @@ OPPORTUNITY_TEMPLATE = """
 """
 
 
+# CSS class suffix per product type (browser_extension -> browser-extension)
+_TYPE_CLASS = {
+    "browser_extension": "browser-extension",
+    "web_app": "web-app",
+    "saas": "saas",
+    "other": "other",
+}
+
+# Markup wrapped around each MVP suggestion
+_MVP_ITEM_OPEN = '<div class="mvp-item">• '
+_MVP_ITEM_CLOSE = "</div>"
+
+# Fallback values for fields the LLM may omit
+_DEFAULT_OPP = {
+    "source_subreddit": "unknown",
+    "crosspost_subreddits": (),
+    "pain_point": "N/A",
+    "product_type": "other",
+    "target_audience": "N/A",
+    "tech_complexity_score": 0,
+    "monetization_score": 0,
+    "claude_code_score": 0,
+    "overall_score": 0,
+    "pricing_estimate": "待定",
+    "mvp_suggestions": (),
+    "tech_stack_recommendation": "未指定",
+    "revenue_potential": "待评估",
+    "source_posts_with_links": (),
+}
+
+
 def format_opportunities_html(opportunities: List[Dict]) -> Tuple[str, Dict]:
     """Format opportunities into HTML and return stats.
 
@@ -373,68 +458,62 @@ def format_opportunities_html(opportunities: List[Dict]) -> Tuple[str, Dict]:
             "top_pick": "无"
         }
 
-    html_parts = []
-    plugin_count = 0
-    webapp_count = 0
+    # Write each rendered card straight into one buffer instead of keeping a list of them
+    buf = io.StringIO()
+
+    # Count product types in one pass
+    type_counts = Counter(opp.get("product_type", "other") for opp in opportunities)
 
     for opp in opportunities:
-        # Count product types
-        product_type = opp.get("product_type", "other")
-        if product_type == "browser_extension":
-            plugin_count += 1
-        elif product_type == "web_app":
-            webapp_count += 1
+        d = _DEFAULT_OPP | opp
 
         # MVP items with new class (already escaped)
         mvp_html = "".join(
-            f'<div class="mvp-item">• {_escape_html(idea)}</div>' for idea in opp.get("mvp_suggestions", [])
+            [_MVP_ITEM_OPEN + _escape_html(idea) + _MVP_ITEM_CLOSE for idea in d["mvp_suggestions"]]
         )
 
-
         # Get links from source_posts_with_links if available
-        source_links = opp.get("source_posts_with_links", [])
+        source_links = d["source_posts_with_links"]
         if source_links:
             # Format links as button-style anchor tags
             link_htmls = []
             for item in source_links[:3]:
                 if isinstance(item, dict) and item.get("link"):
-                    title = item.get("title", "View Post")
-                    link_htmls.append(f'<a href="{item["link"]}" class="link-button">📎 {title}</a>')
+                    title = _escape_html(item.get("title", "View Post"))
+                    href = _escape_html(item["link"])
+                    link_htmls.append(f'<a href="{href}" class="link-button">📎 {title}</a>')
             links = "".join(link_htmls) if link_htmls else "No links available"
         else:
             # Fallback: no links available
             links = "No links available"
 
-        # Convert product_type to hyphenated format for CSS class (browser_extension -> browser-extension)
-        product_type_hyphenated = product_type.replace("_", "-")
-
-        html_parts.append(
+        buf.write(
             OPPORTUNITY_TEMPLATE.format(
-                subreddit=_escape_html(opp.get("source_subreddit", "unknown")),
-                pain_point=_escape_html(opp.get("pain_point", "N/A")),
-                product_type=product_type_hyphenated,
-                audience=_escape_html(opp.get("target_audience", "N/A")),
-                tech_score=opp.get("tech_complexity_score", 0),
-                monetize_score=opp.get("monetization_score", 0),
-                claude_score=opp.get("claude_code_score", 0),
-                overall_score=opp.get("overall_score", 0),
-                pricing=_escape_html(opp.get("pricing_estimate", "待定")),
+                subreddit=_escape_html(" · r/".join((d["source_subreddit"], *d["crosspost_subreddits"]))),
+                pain_point=_escape_html(d["pain_point"]),
+                product_type=_TYPE_CLASS.get(d["product_type"], "other"),
+                audience=_escape_html(d["target_audience"]),
+                tech_score=d["tech_complexity_score"],
+                monetize_score=d["monetization_score"],
+                claude_score=d["claude_code_score"],
+                overall_score=d["overall_score"],
+                pricing=_escape_html(d["pricing_estimate"]),
                 mvp_list=mvp_html,
-                tech_stack=_escape_html(opp.get("tech_stack_recommendation", "未指定")),
-                revenue=_escape_html(opp.get("revenue_potential", "待评估")),
+                tech_stack=_escape_html(d["tech_stack_recommendation"]),
+                revenue=_escape_html(d["revenue_potential"]),
                 links=links,
             )
         )
 
     stats = {
-        "plugin_count": plugin_count,
-        "webapp_count": webapp_count,
+        "plugin_count": type_counts["browser_extension"],
+        "webapp_count": type_counts["web_app"],
         "top_pick": _truncate_text(
-            opportunities[0].get("mvp_suggestions", [opportunities[0].get("pain_point", "无")])[0], 25
-        ) if opportunities else "无"
+            (opportunities[0].get("mvp_suggestions") or [opportunities[0].get("pain_point", "无")])[0], 25
+        )
     }
 
-    return "".join(html_parts), stats
+    return buf.getvalue(), stats
 
 
 def _truncate_text(text: str, max_chars: int) -> str:
@@ -451,14 +530,106 @@ def generate_html_report(analysis: Dict) -> str:
     opportunities = analysis.get("opportunities", [])
     content, stats = format_opportunities_html(opportunities)
 
-    return HTML_TEMPLATE.format(
+    header = _REPORT_HEADER_TEMPLATE.format(
         date=datetime.now().strftime("%Y-%m-%d"),
         count=len(opportunities),
-        content=content,
         plugin_count=stats.get("plugin_count", 0),
         webapp_count=stats.get("webapp_count", 0),
         top_pick=stats.get("top_pick", "无"),
     )
+    return "".join((_REPORT_PREFIX, header, content, _REPORT_SUFFIX))
+
+
+class SMTPSession:
+    """Reusable SMTP connection (TLS + login once, many sends).
+
+    Use as a context manager; a reused connection is health-checked with NOOP
+    before each send and re-established if the server dropped it.
+    Port 465 uses implicit TLS (SMTP_SSL), other ports plain SMTP + STARTTLS.
+    """
+
+    def __init__(
+        self,
+        smtp_host: str,
+        smtp_port: int,
+        username: str,
+        password: str,
+        use_ssl: bool = None,
+        timeout: float = 30.0,
+    ):
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.username = username
+        self.password = password
+        self.use_ssl = smtp_port == 465 if use_ssl is None else use_ssl
+        self.timeout = timeout
+        self.server = None
+        # True until the first send on a freshly opened connection, which needs no NOOP check
+        self._fresh = False
+
+    def connect(self):
+        """Open the connection, set up TLS and log in."""
+        # Drop a previous (possibly dead) connection instead of leaking its socket
+        self._discard()
+        if self.use_ssl:
+            # Implicit TLS skips the STARTTLS upgrade and its extra EHLO round-trip
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.timeout)
+        try:
+            if not self.use_ssl:
+                server.starttls()
+            server.login(self.username, self.password)
+        except BaseException:
+            server.close()
+            raise
+        self.server = server
+        self._fresh = True
+
+    def _discard(self):
+        """Close the socket without a QUIT exchange."""
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+
+    def _is_alive(self) -> bool:
+        if self.server is None:
+            return False
+        try:
+            return self.server.noop()[0] == 250
+        except smtplib.SMTPServerDisconnected:
+            return False
+
+    def send_message(self, msg: EmailMessage, from_addr: str, to_addrs: List[str]):
+        """Send one message, reconnecting once if the connection was dropped."""
+        if not self._fresh and not self._is_alive():
+            self.connect()
+        self._fresh = False
+        try:
+            self.server.send_message(msg, from_addr, to_addrs)
+        except smtplib.SMTPServerDisconnected:
+            self.connect()
+            self._fresh = False
+            self.server.send_message(msg, from_addr, to_addrs)
+
+    def close(self):
+        """Close the connection gracefully."""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        finally:
+            self.server = None
+            self._fresh = False
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
 def send_email(
@@ -469,17 +640,19 @@ def send_email(
     to_emails: List[str],
     subject: str = None,
     html_body: str = None,
+    session: SMTPSession = None,
 ) -> bool:
     """Send email via SMTP.
 
     Args:
         smtp_host: SMTP server hostname
-        smtp_port: SMTP port (usually 587 for TLS)
+        smtp_port: SMTP port (587 for STARTTLS, 465 for implicit TLS)
         username: SMTP login username (usually email address)
         password: SMTP password or app token
         to_emails: List of recipient email addresses
         subject: Email subject (auto-generated if None)
         html_body: HTML content (required)
+        session: Open SMTPSession to reuse (a new connection is opened if None)
 
     Returns:
         True if sent successfully, False otherwise
@@ -493,37 +666,138 @@ def send_email(
         date_str = datetime.now().strftime("%Y-%m-%d")
         subject = f"🎯 Painhunter Daily Report - {date_str}"
 
-    # Create message
-    msg = MIMEMultipart("alternative")
+    # One transaction for all recipients: deduplicate, and list them as Bcc
+    # (send_message strips Bcc) so recipients don't see each other
+    to_emails = list(dict.fromkeys(to_emails))
+
+    # Create message (multipart/alternative: plain-text fallback + HTML)
+    msg = EmailMessage()
     msg["Subject"] = subject
     msg["From"] = username
-    msg["To"] = ", ".join(to_emails)
-
-    # Attach HTML
-    html_part = MIMEText(html_body, "html")
-    msg.attach(html_part)
+    msg["To"] = username
+    msg["Bcc"] = ", ".join(to_emails)
+    msg.set_content("Painhunter Daily Opportunity Report - open this email in an HTML-capable client.")
+    msg.add_alternative(html_body, subtype="html")
 
     try:
         # Connect and send
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(username, password)
-            server.sendmail(username, to_emails, msg.as_string())
+        if session is not None:
+            session.send_message(msg, username, to_emails)
+        else:
+            with SMTPSession(smtp_host, smtp_port, username, password) as new_session:
+                new_session.send_message(msg, username, to_emails)
 
         print(f"Email sent successfully to {len(to_emails)} recipients")
         return True
     except smtplib.SMTPException as e:
-        print(f"Error sending email: SMTP error (code: {e.smtp_code})")
+        print(f"Error sending email: SMTP error (code: {getattr(e, 'smtp_code', None)})")
         return False
     except Exception as e:
         print(f"Error sending email: An unexpected error occurred")
         return False
 
 
+class ConfigError(ValueError):
+    """Raised when required SMTP settings are missing."""
+
+
+@dataclass(frozen=True)
+class SMTPConfig:
+    """Validated SMTP settings."""
+
+    host: str
+    port: int
+    username: str
+    password: str
+    to_emails: Tuple[str, ...]
+
+    def as_kwargs(self) -> Dict:
+        """Keyword arguments for send_email."""
+        return {
+            "smtp_host": self.host,
+            "smtp_port": self.port,
+            "username": self.username,
+            "password": self.password,
+            "to_emails": list(self.to_emails),
+        }
+
+
+def _build_smtp_config(host, port, username, password, to_emails) -> SMTPConfig:
+    """Normalize and validate SMTP settings, raising ConfigError if any are missing or invalid."""
+    if isinstance(to_emails, str):
+        to_emails = to_emails.split(",")
+    to_emails = tuple(e.strip() for e in to_emails or () if e and e.strip())
+
+    missing = [
+        name
+        for name, value in (
+            ("SMTP_HOST", host),
+            ("SMTP_USERNAME", username),
+            ("SMTP_PASSWORD", password),
+            ("TO_EMAILS", to_emails),
+        )
+        if not value
+    ]
+    if missing:
+        raise ConfigError(f"Missing email settings: {', '.join(missing)}")
+
+    try:
+        port = int(port or 587)
+    except (TypeError, ValueError):
+        raise ConfigError(f"Invalid SMTP_PORT: {port!r}") from None
+    if not 0 < port < 65536:
+        raise ConfigError(f"Invalid SMTP_PORT: {port!r}")
+
+    return SMTPConfig(host, port, username, password, to_emails)
+
+
+@cache
+def smtp_config() -> SMTPConfig:
+    """Load SMTP settings from the environment once per process.
+
+    Raises:
+        ConfigError: If a required setting is missing or SMTP_PORT is invalid
+            (not cached, so a later call after fixing the environment retries).
+    """
+    env = os.environ
+    return _build_smtp_config(
+        env.get("SMTP_HOST"),
+        env.get("SMTP_PORT"),
+        env.get("SMTP_USERNAME"),
+        env.get("SMTP_PASSWORD"),
+        env.get("TO_EMAILS"),
+    )
+
+
+def _load_smtp_settings(
+    smtp_host: str = None,
+    smtp_port: int = None,
+    username: str = None,
+    password: str = None,
+    to_emails: List[str] = None,
+) -> Optional[SMTPConfig]:
+    """Resolve SMTP settings, falling back to the environment; None if any are missing or invalid."""
+    try:
+        if not any([smtp_host, smtp_port, username, password, to_emails]):
+            return smtp_config()
+        env = os.environ
+        return _build_smtp_config(
+            smtp_host or env.get("SMTP_HOST"),
+            smtp_port or env.get("SMTP_PORT"),
+            username or env.get("SMTP_USERNAME"),
+            password or env.get("SMTP_PASSWORD"),
+            to_emails or env.get("TO_EMAILS"),
+        )
+    except ConfigError as e:
+        print(f"Warning: {e}")
+        print("Set these in .env or environment variables")
+        return None
+
+
 def send_report(
     analysis: Dict,
     smtp_host: str = None,
-    smtp_port: int = 587,
+    smtp_port: int = None,
     username: str = None,
     password: str = None,
     to_emails: List[str] = None,
@@ -532,37 +806,48 @@ def send_report(
 
     Reads SMTP settings from environment if not provided.
     """
-    # Get settings from environment
-    smtp_host = smtp_host or os.environ.get("SMTP_HOST")
-    smtp_port = smtp_port or int(os.environ.get("SMTP_PORT", 587))
-    username = username or os.environ.get("SMTP_USERNAME")
-    password = password or os.environ.get("SMTP_PASSWORD")
-
-    to_emails = to_emails or os.environ.get("TO_EMAILS", "").split(",")
-
-    # Validate required settings
-    if not all([smtp_host, username, password, to_emails]):
-        missing = []
-        if not smtp_host: missing.append("SMTP_HOST")
-        if not username: missing.append("SMTP_USERNAME")
-        if not password: missing.append("SMTP_PASSWORD")
-        if not to_emails or not to_emails[0]: missing.append("TO_EMAILS")
-        print(f"Warning: Missing email settings: {', '.join(missing)}")
-        print("Set these in .env or environment variables")
+    config = _load_smtp_settings(smtp_host, smtp_port, username, password, to_emails)
+    if config is None:
         return False
 
     # Generate HTML report
     html_body = generate_html_report(analysis)
 
     # Send email
-    return send_email(
-        smtp_host=smtp_host,
-        smtp_port=smtp_port,
-        username=username,
-        password=password,
-        to_emails=[e.strip() for e in to_emails if e.strip()],
-        html_body=html_body,
-    )
+    return send_email(html_body=html_body, **config.as_kwargs())
+
+
+def send_reports_bulk(
+    analyses: List[Dict],
+    smtp_host: str = None,
+    smtp_port: int = None,
+    username: str = None,
+    password: str = None,
+    to_emails: List[str] = None,
+) -> List[bool]:
+    """Send several reports over a single SMTP connection.
+
+    Reads SMTP settings from environment if not provided.
+
+    Returns:
+        Per-report send results, in input order
+    """
+    config = _load_smtp_settings(smtp_host, smtp_port, username, password, to_emails)
+    if config is None:
+        return [False] * len(analyses)
+
+    try:
+        with SMTPSession(config.host, config.port, config.username, config.password) as session:
+            return [
+                send_email(html_body=generate_html_report(analysis), session=session, **config.as_kwargs())
+                for analysis in analyses
+            ]
+    except smtplib.SMTPException as e:
+        print(f"Error sending email: SMTP error (code: {getattr(e, 'smtp_code', None)})")
+        return [False] * len(analyses)
+    except OSError:
+        print("Error sending email: could not connect to SMTP server")
+        return [False] * len(analyses)
 
 
 if __name__ == "__main__":
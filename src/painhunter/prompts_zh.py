@@ -0,0 +1,162 @@
+"""Chinese prompt templates for Painhunter LLM analysis."""
+
+
+# System prompt for pain point analysis
+SYSTEM_PROMPT = """你是一位浏览器插件产品分析师和独立开发者顾问。你的使命是发现独立开发者可以快速构建并变现的产品机会。
+
+## 核心优先级
+
+**产品形态优先级（按顺序）：**
+1. **浏览器插件** - 优先识别，任何涉及浏览器操作、网页增强、用户脚本的需求
+2. **轻量级 Web 应用** - 配合浏览器插件使用的辅助服务
+3. **其他产品** - 仅在上述都不适用时考虑
+
+## 分析维度
+
+对于每批帖子，你需要分析并提取：
+
+### 1. 痛点总结
+用户抱怨或寻求解决方案的具体问题是什么？用一句话精准描述。
+
+### 2. 目标受众
+谁面临这个问题？（具体到职业/场景，如：独立站卖家、程序员、内容创作者）
+
+### 3. 产品形态判定
+- "browser_extension" - 浏览器插件需求
+- "web_app" - 独立 Web 应用
+- "saas" - SaaS 服务
+- "other" - 其他
+
+### 4. 评分维度 (1-5分)
+
+#### 技术实现难度 (tech_complexity_score)
+- 1分: 单文件插件，Claude Code 可在数小时内完成
+- 2分: 简单插件 + 本地存储，无需后端
+- 3分: 插件 + 简单后端 API (FastAPI/Cloudflare Workers)
+- 4分: 复杂插件 + 完整后端 + 认证系统
+- 5分: 需要复杂基础设施或第三方集成
+
+#### 变现潜力 (monetization_score)
+- 1分: 小众需求，难以规模化
+- 2分: 细分市场，潜在用户有限
+- 3分: 中等市场，可支撑 $5-15/月定价
+- 4分: 较大市场，可支撑 $15-29/月定价
+- 5分: 广阔市场，有涨价空间
+
+#### Claude Code 实现可行性 (claude_code_score)
+- 1分: Claude Code 可独立完成，无需人工介入
+- 3分: 需要少量人工指导和代码审查
+- 5分: 需要大量人工干预和复杂架构设计
+
+### 5. MVP 建议格式
+必须使用 "【X】插件 + Y 功能" 格式，例如：
+- "【标签页管理】Tab 增强插件 + AI 自动分类功能"
+- "【评论增强】插件 + 一键模板回复功能"
+
+每个机会给出 1-2 个 MVP 建议。
+
+### 6. 预估定价
+给出合理的订阅价格区间（$5-29/月）。
+
+请用中文返回分析结果，使用指定的 JSON 格式。"""
+
+
+# 静态说明在前、帖子在后，使各次请求共享可被服务端缓存的前缀
+USER_PROMPT_TEMPLATE = """分析下方的 Reddit 帖子，基于用户痛点识别浏览器插件类商业机会。
+
+## 输出格式 (JSON)：
+{{
+  "opportunities": [
+    {{
+      "pain_point": "用户面临问题的精准描述",
+      "target_audience": "具体目标用户群体",
+      "product_type": "browser_extension | web_app | saas | other",
+      "tech_complexity_score": 1-5,
+      "monetization_score": 1-5,
+      "claude_code_score": 1-5,
+      "pricing_estimate": "$X-$Y/月",
+      "mvp_suggestions": [
+        "【类型】插件 + 核心功能描述"
+      ],
+      "tech_stack_recommendation": "推荐技术栈",
+      "differentiation": "与竞品的差异化点",
+      "revenue_potential": "预估月收入（如：1000用户×$10 = $10,000/月）",
+      "source_posts": ["帖子标题 1", "帖子标题 2"]
+    }}
+  ],
+  "summary": {{
+    "total_opportunities": 5,
+    "browser_extension_count": 3,
+    "quick_win": "技术复杂度1分，可立即实现的机会"
+  }}
+}}
+
+## 评分标准
+
+### 技术实现难度 (tech_complexity_score)
+- 1: 单文件油猴脚本/简单书签工具
+- 2: 简单 Chrome 扩展，manifest V3，基础功能
+- 3: 中等复杂度插件，Popup + Content Script + Background，无复杂后端
+- 4: 复杂插件，需要后端 API
+- 5: 复杂系统，需要数据库、认证、支付
+
+### 变现潜力 (monetization_score)
+- 1-2: 小众市场
+- 3: 细分市场，可支撑 $5-15/月
+- 4: 中等市场，可支撑 $15-29/月
+- 5: 大众市场，有涨价空间
+
+### Claude Code 可实现性 (claude_code_score)
+- 1: Claude Code 可独立完成全部代码
+- 2-3: Claude Code 可完成大部分，需少量人工
+- 4-5: 需要大量人工设计和编码
+
+## 关键要求
+- 只输出 3-5 个最有价值的机会
+- MVP 必须是 Claude Code 可在 1-3 天内实现的产品
+- 优先选择浏览器插件类机会
+- 预估定价必须落在 $5-29/月 区间
+
+## 待分析的帖子（共 {count} 条）：
+{posts_text}"""
+
+
+# 初筛提示词（逐条返回 Y/N）
+SCREENING_PROMPT = """判断每条 Reddit 帖子是否有价值。
+
+判断标准（满足任意一条即为有价值）：
+1. 用户遇到痛点或问题，正在寻求解决方案
+2. 用户表达了对现有工具/产品的不满
+3. 用户有明确的产品想法或功能需求
+4. 适合独立开发者快速构建的浏览器插件或轻量级 Web 应用机会
+
+输出格式：按帖子顺序每条输出一个字母，有价值输出 Y，否则输出 N，字母之间不加分隔。
+例如 5 条帖子输出：YNNYN
+
+只返回字母串，不要其他内容。"""
+
+
+# 调试模式使用的初筛提示词（返回带理由的 JSON）
+SCREENING_PROMPT_DEBUG = """判断每条 Reddit 帖子是否包含以下特征（只返回 JSON 数组）：
+
+判断标准（满足任意一条即为有价值）：
+1. 用户遇到痛点或问题，正在寻求解决方案
+2. 用户表达了对现有工具/产品的不满
+3. 用户有明确的产品想法或功能需求
+4. 适合独立开发者快速构建的浏览器插件或轻量级 Web 应用机会
+
+输出格式（JSON 数组）：
+[
+  {"index": 0, "is_valuable": true, "reason": "简短理由"},
+  {"index": 1, "is_valuable": false, "reason": "..."}
+]
+
+只返回 JSON，不要其他内容。"""
+
+
+# 初筛系统消息
+SCREENING_SYSTEM_PROMPT = "你是一个帖子筛选助手，只返回由 Y/N 组成的判断结果。"
+SCREENING_SYSTEM_PROMPT_DEBUG = "你是一个帖子筛选助手，只返回 JSON 格式的判断结果。"
+
+# 初筛用户消息模板
+SCREENING_USER_TEMPLATE = "{prompt}\n\n待筛选的帖子：\n\n{posts_text}"
@@ -1,117 +1,403 @@
 """RSS Fetcher module for Reddit pain point discovery."""
 
+import asyncio
+import html
+import importlib.util
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict
-import feedparser
+from typing import Iterator, List, Dict, Optional, Tuple, Union
+from xml.etree import ElementTree
 import httpx
 
+from src.painhunter.cache import (
+    LLMCache,
+    get_feed_cache,
+    get_posts_cache,
+    get_seen_cache,
+    make_cache_key,
+)
+
+
+logger = logging.getLogger(__name__)
+
 
 # Reddit RSS endpoint
 REDDIT_RSS_BASE = "https://www.reddit.com/r/{subreddit}/top/.rss?t=day"
 
+# With the optional h2 package (httpx[http2]) all feed requests multiplex over one connection
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Atom namespace used by Reddit feeds; tags are pre-qualified so lookups skip
+# ElementPath's prefix expansion and match child tags directly
+ATOM = "{http://www.w3.org/2005/Atom}"
+ATOM_ENTRY = ATOM + "entry"
+ATOM_TITLE = ATOM + "title"
+ATOM_LINK = ATOM + "link"
+ATOM_PUBLISHED = ATOM + "published"
+ATOM_UPDATED = ATOM + "updated"
+ATOM_AUTHOR_NAME = ATOM + "author/" + ATOM + "name"
+ATOM_CONTENT = ATOM + "content"
+ATOM_SUMMARY = ATOM + "summary"
+
 # User-Agent to mimic browser and avoid blocking
 HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    # Compressed feeds are decoded by httpx; "br" is left out since it needs the optional brotli package
+    "Accept-Encoding": "gzip, deflate",
 }
 
 
 def parse_reddit_timestamp(published: str) -> datetime:
     """Parse Reddit's feed timestamp format."""
-    # Reddit uses RFC 2822 format
-    parsed = datetime.strptime(published, "%Y-%m-%dT%H:%M:%S%z")
-    return parsed
+    # Reddit uses ISO 8601 (e.g. 2024-01-01T12:00:00+00:00). fromisoformat is C-implemented
+    # and, on Python 3.11+, accepts everything the old strptime format did (including
+    # +0000 offsets and a trailing Z), so no fallback is needed.
+    return datetime.fromisoformat(published)
+
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+
+
+def _html_to_text(markup: str) -> str:
+    """Reduce Reddit's HTML post body to plain text with collapsed whitespace."""
+    return " ".join(html.unescape(_HTML_TAG.sub(" ", markup)).split())
+
+
+def _cutoff(hours: int) -> datetime:
+    """Earliest publication time inside a window of the last N hours."""
+    return datetime.now(timezone.utc) - timedelta(hours=hours)
 
 
 def is_within_hours(published_dt: datetime, hours: int = 24) -> bool:
-    """Check if the post was published within the specified hours."""
-    now = datetime.now(timezone.utc)
-    threshold = now - timedelta(hours=hours)
-    return published_dt >= threshold
+    """Check if the post was published within the specified hours.
 
+    For a single check only; when filtering many entries, compute _cutoff() once.
+    """
+    return published_dt >= _cutoff(hours)
 
-def fetch_subreddit_posts(subreddit: str, hours_ago: int = 24, max_posts: int = 100) -> List[Dict]:
+
+def _parse_entry(entry: ElementTree.Element, subreddit: str, threshold: datetime) -> Optional[Dict]:
+    """Build a post dict from one Atom entry; None if it is undated or too old."""
+    # Parse publication time
+    published = entry.findtext(ATOM_PUBLISHED) or entry.findtext(ATOM_UPDATED)
+    if not published:
+        return None
+    try:
+        published_dt = parse_reddit_timestamp(published)
+    except ValueError:
+        logger.debug(f"Skipping entry with unparseable timestamp: {published!r}")
+        return None
+    if published_dt.tzinfo is None:
+        published_dt = published_dt.replace(tzinfo=timezone.utc)
+
+    # Skip if outside time window
+    if published_dt < threshold:
+        return None
+
+    link = entry.find(ATOM_LINK)
+    # Reddit puts the post body in <content>; fall back to <summary>
+    summary = entry.findtext(ATOM_CONTENT) or entry.findtext(ATOM_SUMMARY, "")
+    if summary:
+        summary = _html_to_text(summary)
+        # Truncate long summaries; most are shorter, so skip the copy then
+        if len(summary) > 500:
+            summary = summary[:500]
+
+    return {
+        "subreddit": subreddit,
+        "title": entry.findtext(ATOM_TITLE, ""),
+        "link": link.get("href", "") if link is not None else "",
+        "published": published_dt,  # kept as datetime; serialized only when cached
+        "author": entry.findtext(ATOM_AUTHOR_NAME, ""),
+        "summary": summary,
+    }
+
+
+def _iter_entries(content: Union[bytes, str]) -> Iterator[ElementTree.Element]:
+    """Incrementally parse a feed, yielding each <entry> and clearing it afterwards."""
+    # Wrap the body in a buffer view instead of copying it; cached bodies are already str
+    source = io.StringIO(content) if isinstance(content, str) else io.BytesIO(content)
+    root = None
+    for event, elem in ElementTree.iterparse(source, events=("start", "end")):
+        if root is None:
+            root = elem
+        elif event == "end" and elem.tag == ATOM_ENTRY:
+            yield elem
+            # Drop consumed entries (and feed-level siblings) from the root so the
+            # partially built tree never holds more than the entry being read
+            root.clear()
+
+
+def _parse_feed_entries(content: Union[bytes, str], subreddit: str, hours_ago: int, max_posts: int) -> List[Dict]:
+    """Parse a subreddit feed body into post dictionaries."""
+    # Compute the cutoff once per feed rather than per entry
+    threshold = _cutoff(hours_ago)
+    # Every post (and the analyzer's per-subreddit grouping keys) shares one string object
+    subreddit = sys.intern(subreddit)
+
+    # The top/?t=day feed is ordered by score, not date, so an old entry does not
+    # mean the rest are old too; stop only once max_posts entries are collected.
+    # _parse_entry rejects out-of-window entries before reading any other field.
+    posts = []
+    try:
+        for entry in _iter_entries(content):
+            post = _parse_entry(entry, subreddit, threshold)
+            if post:
+                posts.append(post)
+                if len(posts) >= max_posts:
+                    break
+    except ElementTree.ParseError as e:
+        logger.warning(f"Error parsing feed for r/{subreddit}: {e}")
+    return posts
+
+
+def _conditional_request(url: str) -> Tuple[Optional[LLMCache], Optional[Dict], Dict]:
+    """Look up the cached feed for url and build conditional-GET headers.
+
+    Returns:
+        Tuple of (cache, cached_entry, request_headers)
+    """
+    cache = get_feed_cache()
+    raw = cache.get(url) if cache else None
+    cached = json.loads(raw) if raw else None
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    return cache, cached, headers
+
+
+def _feed_content(
+    response: httpx.Response, url: str, cache: Optional[LLMCache], cached: Optional[Dict]
+) -> Union[bytes, str]:
+    """Return the feed body, reusing the cached copy on 304 Not Modified."""
+    if response.status_code == 304 and cached:
+        # Parse the cached text as-is rather than re-encoding it to bytes
+        return cached["body"]
+
+    response.raise_for_status()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if cache and (etag or last_modified):
+        cache.set(url, json.dumps({
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": response.content.decode("utf-8", errors="replace"),
+        }))
+    return response.content
+
+
+def _posts_cache_key(subreddit: str, hours_ago: int, max_posts: int) -> str:
+    """Cache key for a subreddit's parsed posts, bucketed by the current hour."""
+    return make_cache_key("posts", subreddit, hours_ago, max_posts, int(time.time() // 3600))
+
+
+def _load_cached_posts(key: str) -> Optional[List[Dict]]:
+    cache = get_posts_cache()
+    raw = cache.get(key) if cache else None
+    if raw is None:
+        return None
+    posts = json.loads(raw)
+    for post in posts:
+        post["published"] = datetime.fromisoformat(post["published"])
+    return posts
+
+
+def _store_cached_posts(key: str, posts: List[Dict]):
+    cache = get_posts_cache()
+    if cache:
+        cache.set(key, json.dumps(posts, ensure_ascii=False, default=datetime.isoformat))
+
+
+def fetch_subreddit_posts(
+    subreddit: str,
+    hours_ago: int = 24,
+    max_posts: int = 100,
+    client: httpx.Client = None,
+    use_cache: bool = True,
+) -> List[Dict]:
     """Fetch posts from a subreddit's RSS feed within the specified time window.
 
     Args:
         subreddit: Subreddit name (without 'r/')
         hours_ago: Only fetch posts from the last N hours
         max_posts: Maximum number of posts to fetch (default 100)
+        client: Shared client to reuse keep-alive connections (a new one is opened if None)
+        use_cache: Reuse posts already fetched for this subreddit within the current hour
 
     Returns:
         List of post dictionaries
     """
+    key = _posts_cache_key(subreddit, hours_ago, max_posts)
+    if use_cache:
+        posts = _load_cached_posts(key)
+        if posts is not None:
+            return posts
+
     url = REDDIT_RSS_BASE.format(subreddit=subreddit)
-    posts = []
+    cache, cached, conditional_headers = _conditional_request(url)
 
-    with httpx.Client(headers=HEADERS, timeout=30.0) as client:
-        response = client.get(url)
-        response.raise_for_status()
-        feed = feedparser.parse(response.content)
-
-        for entry in feed.entries:
-            if len(posts) >= max_posts:
-                break
-            try:
-                # Parse publication time
-                if hasattr(entry, 'published'):
-                    published_dt = parse_reddit_timestamp(entry.published)
-                elif hasattr(entry, 'updated'):
-                    published_dt = parse_reddit_timestamp(entry.updated)
-                else:
-                    continue
-
-                # Skip if outside time window
-                if not is_within_hours(published_dt, hours_ago):
-                    continue
-
-                post = {
-                    "subreddit": subreddit,
-                    "title": entry.get("title", ""),
-                    "link": entry.get("link", ""),
-                    "published": published_dt.isoformat(),
-                    "author": entry.get("author", ""),
-                    "summary": entry.get("summary", "")[:500],  # Truncate long summaries
-                }
-                posts.append(post)
-            except Exception as e:
-                print(f"Error parsing entry: {e}")
-                continue
+    if client is None:
+        with httpx.Client(headers=HEADERS, timeout=30.0) as own_client:
+            response = own_client.get(url, headers=conditional_headers)
+    else:
+        response = client.get(url, headers=conditional_headers)
+    content = _feed_content(response, url, cache, cached)
+    posts = _parse_feed_entries(content, subreddit, hours_ago, max_posts)
 
+    if use_cache:
+        _store_cached_posts(key, posts)
     return posts
 
 
-def fetch_reddit_posts(
+async def fetch_subreddit_posts_async(
+    client: httpx.AsyncClient,
+    subreddit: str,
+    hours_ago: int = 24,
+    max_posts: int = 100,
+    use_cache: bool = True,
+    url: str = None,
+) -> List[Dict]:
+    """Async version of fetch_subreddit_posts using a shared client.
+
+    url may be passed pre-formatted by the caller; it defaults to the subreddit's feed.
+    """
+    key = _posts_cache_key(subreddit, hours_ago, max_posts)
+    if use_cache:
+        posts = _load_cached_posts(key)
+        if posts is not None:
+            logger.info(f"Using cached posts for r/{subreddit} ({len(posts)} posts)")
+            return posts
+
+    if url is None:
+        url = REDDIT_RSS_BASE.format(subreddit=subreddit)
+    cache, cached, conditional_headers = _conditional_request(url)
+
+    logger.info(f"Fetching posts from r/{subreddit}...")
+    response = await client.get(url, headers=conditional_headers)
+    content = _feed_content(response, url, cache, cached)
+    posts = _parse_feed_entries(content, subreddit, hours_ago, max_posts)
+    logger.info(f"  Found {len(posts)} posts in r/{subreddit} in the last {hours_ago} hours")
+
+    if use_cache:
+        _store_cached_posts(key, posts)
+    return posts
+
+
+async def fetch_reddit_posts_async(
     subreddits: List[str] = None,
     hours_ago: int = 24,
     max_posts_per_subreddit: int = 100,
+    use_cache: bool = True,
 ) -> List[Dict]:
-    """Main function to fetch Reddit posts.
+    """Fetch all subreddits concurrently over one pooled client.
 
     Args:
         subreddits: List of subreddit names (without 'r/')
         hours_ago: Only fetch posts from the last N hours
         max_posts_per_subreddit: Maximum posts per subreddit (default 100)
+        use_cache: Reuse posts already fetched for a subreddit within the current hour
 
     Returns:
-        List of post dictionaries (unfiltered)
+        List of post dictionaries with unique links, in subreddit order
     """
     if subreddits is None:
         subreddits = ["SaaS", "Entrepreneur"]
 
+    # Build every feed URL up front so each fetch coroutine only does the request
+    urls = [REDDIT_RSS_BASE.format(subreddit=subreddit) for subreddit in subreddits]
+
+    # One pooled client for every feed; all subreddits share www.reddit.com
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    async with httpx.AsyncClient(
+        headers=HEADERS, timeout=30.0, limits=limits, http2=_HTTP2_AVAILABLE
+    ) as client:
+        results = await asyncio.gather(*(
+            fetch_subreddit_posts_async(
+                client, subreddit, hours_ago, max_posts_per_subreddit, use_cache, url=url
+            )
+            for subreddit, url in zip(subreddits, urls)
+        ))
+
+    # Drop repeated links across subreddits (first occurrence wins)
+    seen_links = set()
     all_posts = []
-    for subreddit in subreddits:
-        print(f"Fetching posts from r/{subreddit}...")
-        posts = fetch_subreddit_posts(subreddit, hours_ago, max_posts_per_subreddit)
-        print(f"  Found {len(posts)} posts in the last {hours_ago} hours")
-        all_posts.extend(posts)
+    for posts in results:
+        for post in posts:
+            if post["link"] not in seen_links:
+                seen_links.add(post["link"])
+                all_posts.append(post)
+
+    logger.info(f"Total posts fetched: {len(all_posts)}")
 
-    print(f"\nTotal posts fetched: {len(all_posts)}")
+    if os.environ.get("PAINHUNTER_SKIP_SEEN"):
+        all_posts = _skip_seen_posts(all_posts)
 
     return all_posts
 
 
+def _skip_seen_posts(posts: List[Dict]) -> List[Dict]:
+    """Drop posts whose links were recorded by mark_posts_seen in a previous run."""
+    cache = get_seen_cache()
+    if cache is None:
+        return posts
+
+    keys = [make_cache_key("seen", post["link"]) for post in posts]
+    seen = cache.get_many(keys)
+    fresh = [post for post, key in zip(posts, keys) if key not in seen]
+    logger.info(f"Skipped {len(posts) - len(fresh)} posts seen in previous runs")
+    return fresh
+
+
+def mark_posts_seen(posts: List[Dict]):
+    """Record post links so later runs with PAINHUNTER_SKIP_SEEN skip them.
+
+    Call only once the posts have been analyzed and reported; links recorded
+    at fetch time would be lost for good if the run failed afterwards.
+    """
+    cache = get_seen_cache()
+    if cache is None:
+        return
+    cache.set_many((make_cache_key("seen", post["link"]), "1") for post in posts)
+
+
+def fetch_reddit_posts(
+    subreddits: List[str] = None,
+    hours_ago: int = 24,
+    max_posts_per_subreddit: int = 100,
+    use_cache: bool = True,
+) -> List[Dict]:
+    """Main function to fetch Reddit posts.
+
+    Synchronous wrapper around fetch_reddit_posts_async; use the async
+    version from inside a running event loop.
+
+    Args:
+        subreddits: List of subreddit names (without 'r/')
+        hours_ago: Only fetch posts from the last N hours
+        max_posts_per_subreddit: Maximum posts per subreddit (default 100)
+        use_cache: Reuse posts already fetched for a subreddit within the current hour
+
+    Returns:
+        List of post dictionaries (unfiltered)
+    """
+    return asyncio.run(
+        fetch_reddit_posts_async(subreddits, hours_ago, max_posts_per_subreddit, use_cache)
+    )
+
+
 if __name__ == "__main__":
     # Test the fetcher
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     posts = fetch_reddit_posts(subreddits=["SaaS", "Entrepreneur"], hours_ago=24)
     print(f"\n=== Filtered Posts ({len(posts)}) ===")
     for post in posts: